@@ -12,8 +12,6 @@ Bluefruit Connect App superclass for all data packets with (x, y, z) values
 
 """
 
-import struct
-
 from .packet import Packet
 
 
@@ -21,7 +19,6 @@ class _XYZPacket(Packet):
     """A packet of x, y, z float values. Used for several different Bluefruit controller packets."""
 
     _FMT_PARSE = "<xxfffx"
-    PACKET_LENGTH = struct.calcsize(_FMT_PARSE)
     # _FMT_CONSTRUCT doesn't include the trailing checksum byte.
     _FMT_CONSTRUCT = "<2sfff"
     # _TYPE_HEADER is set by each concrete subclass.
@@ -35,8 +32,8 @@ class _XYZPacket(Packet):
 
     def to_bytes(self):
         """Return the bytes needed to send this packet."""
-        partial_packet = struct.pack(
-            self._FMT_CONSTRUCT, self._TYPE_HEADER, self._x, self._y, self._z
+        partial_packet = self._CONSTRUCT_STRUCT.pack(
+            self._TYPE_HEADER, self._x, self._y, self._z
         )
         return self.add_checksum(partial_packet)
 
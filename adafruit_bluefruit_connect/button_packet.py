@@ -13,8 +13,6 @@ Bluefruit Connect App Button data packet (button_name, pressed/released)
 
 """
 
-import struct
-
 from .packet import Packet
 
 
@@ -40,7 +38,6 @@ class ButtonPacket(Packet):
     """Right Button."""
 
     _FMT_PARSE = "<xxssx"
-    PACKET_LENGTH = struct.calcsize(_FMT_PARSE)
     # _FMT_CONSTRUCT doesn't include the trailing checksum byte.
     _FMT_CONSTRUCT = "<2sss"
     _TYPE_HEADER = b"!B"
@@ -68,15 +65,14 @@ class ButtonPacket(Packet):
         Do not call this directly; call Packet.from_bytes() instead.
         pylint makes it difficult to call this method _parse(), hence the name.
         """
-        button, pressed = struct.unpack(cls._FMT_PARSE, packet)
+        button, pressed = cls._PARSE_STRUCT.unpack(packet)
         if not pressed in b"01":
             raise ValueError("Bad button press/release value")
         return cls(chr(button[0]), pressed == b"1")
 
     def to_bytes(self):
         """Return the bytes needed to send this packet."""
-        partial_packet = struct.pack(
-            self._FMT_CONSTRUCT,
+        partial_packet = self._CONSTRUCT_STRUCT.pack(
             self._TYPE_HEADER,
             bytes(self._button, "utf-8"),
             b"1" if self._pressed else b"0",
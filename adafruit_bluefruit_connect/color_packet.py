@@ -12,8 +12,6 @@ Bluefruit Connect App color data packet.
 
 """
 
-import struct
-
 from .packet import Packet
 
 
@@ -21,7 +19,6 @@ class ColorPacket(Packet):
     """A packet containing an RGB color value."""
 
     _FMT_PARSE = "<xx3Bx"
-    PACKET_LENGTH = struct.calcsize(_FMT_PARSE)
     # _FMT_CONSTRUCT doesn't include the trailing checksum byte.
     _FMT_CONSTRUCT = "<2s3B"
     _TYPE_HEADER = b"!C"
@@ -46,13 +43,11 @@ class ColorPacket(Packet):
         Do not call this directly; call Packet.from_bytes() instead.
         pylint makes it difficult to call this method _parse(), hence the name.
         """
-        return cls(struct.unpack(cls._FMT_PARSE, packet))
+        return cls(cls._PARSE_STRUCT.unpack(packet))
 
     def to_bytes(self):
         """Return the bytes needed to send this packet."""
-        partial_packet = struct.pack(
-            self._FMT_CONSTRUCT, self._TYPE_HEADER, *self._color
-        )
+        partial_packet = self._CONSTRUCT_STRUCT.pack(self._TYPE_HEADER, *self._color)
         return self.add_checksum(partial_packet)
 
     @property
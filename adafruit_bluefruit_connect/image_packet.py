@@ -0,0 +1,365 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_bluefruit_connect.image_packet`
+====================================================
+
+Bluefruit Connect App image data packet.
+
+Unlike the other Controller packets, an image packet is variable length:
+the header gives the color depth and image size, and the pixel data that
+follows is ``width * height * bytes_per_pixel`` bytes long.
+
+* Author(s): Alec Delaney for Adafruit Industries
+
+"""
+
+import struct
+import sys
+from array import array
+
+import displayio
+
+from .packet import Packet
+
+# On hosts with numpy the pixel decode can be vectorized; the pure-Python
+# path below is always available as a fallback. The guard also covers ulab
+# builds that expose a numpy module without the pieces needed here.
+try:
+    import numpy as _np
+
+    if not (hasattr(_np, "frombuffer") and hasattr(_np, "unique")):
+        _np = None
+except ImportError:
+    _np = None
+
+# RGB565 channels widen to 8 bits by replicating their high bits into the low
+# bits, so full intensity maps to 0xFF. With only 32 (or 64) possible values
+# per channel, the results are precomputed once here. On boards where even
+# these small tables are too much, set _USE_LUT to False to compute the same
+# values inline instead.
+_USE_LUT = True
+
+if _USE_LUT:
+    _CHANNEL5_TO_8 = bytes(((value << 3) | (value >> 2)) for value in range(32))
+    _CHANNEL6_TO_8 = bytes(((value << 2) | (value >> 4)) for value in range(64))
+else:
+    _CHANNEL5_TO_8 = None
+    _CHANNEL6_TO_8 = None
+
+
+class ImagePacket(Packet):
+    """A packet containing an image."""
+
+    # _PARSE_META_STRUCT covers only the fixed-length metadata at the start
+    # of the packet; the pixel data and checksum that follow are variable
+    # length, so _FMT_PARSE and PACKET_LENGTH stay None.
+    _PARSE_META_STRUCT = struct.Struct("<xxBHH")
+    # _META_STRUCT is the same metadata without the two header bytes, as it
+    # arrives from the stream.
+    _META_STRUCT = struct.Struct("<BHH")
+    # _FMT_CONSTRUCT doesn't include the pixel data or the trailing checksum byte.
+    _FMT_CONSTRUCT = "<2sBHH"
+    _TYPE_HEADER = b"!I"
+
+    # Tell the Packet machinery this type is streamed in acknowledged chunks.
+    _VARIABLE_LENGTH = True
+
+    # Number of bytes before the pixel data: '!I', color depth, width, height.
+    _METADATA_LENGTH = _PARSE_META_STRUCT.size
+
+    # Number of pixel data bytes sent between acknowledgements when streaming.
+    _INTERLEAVE_SIZE = 200
+
+    # Precompiled pixel formats for assembling outgoing pixel data.
+    _STRUCT_RGB565 = struct.Struct("<H")
+    _STRUCT_RGB888 = struct.Struct("<BBB")
+
+    def __init__(
+        self, raw_pixels, color_depth, width, height, *, bitmap_and_palette=None
+    ):
+        """Construct an ImagePacket from the raw pixel data and image metadata.
+
+        :param bytes raw_pixels: the pixel data, ``width * height`` pixels
+          of ``color_depth // 8`` bytes each, in little-endian order
+        :param int color_depth: the number of bits per pixel, either 16
+          (RGB565) or 24 (RGB888)
+        :param int width: the width of the image in pixels
+        :param int height: the height of the image in pixels
+        :param bitmap_and_palette: an optional ``(bitmap, palette)`` tuple
+          matching the raw pixel data; if not given, one is parsed from
+          the pixel data
+        """
+        if color_depth not in (16, 24):
+            raise ValueError("Color depth must be 16 or 24")
+        if len(raw_pixels) != width * height * (color_depth // 8):
+            raise ValueError("Wrong length of pixel data")
+
+        self._raw_pixels = raw_pixels
+        self._color_depth = color_depth
+        self._width = width
+        self._height = height
+        # Computed by the first to_bytes() when the pixel data is immutable.
+        self._cached_checksum = None
+
+        if bitmap_and_palette is None:
+            self._parse_pixels()
+        else:
+            self._bitmap, self._palette = bitmap_and_palette
+
+    @classmethod
+    def from_image(cls, bitmap, palette, color_depth=16):
+        """Construct an ImagePacket from a displayio ``Bitmap`` and ``Palette``.
+
+        :param bitmap: a ``displayio.Bitmap`` of palette indices
+        :param palette: the ``displayio.Palette`` the bitmap indexes into
+        :param int color_depth: the number of bits per pixel to send, either
+          16 (RGB565) or 24 (RGB888)
+        """
+        if color_depth not in (16, 24):
+            raise ValueError("Color depth must be 16 or 24")
+        bytes_per_pixel = color_depth // 8
+        is_rgb565 = color_depth == 16
+
+        # Pack into a preallocated buffer rather than growing a bytearray
+        # with one small bytes object per pixel.
+        pixel_data = bytearray(bitmap.width * bitmap.height * bytes_per_pixel)
+        pixel_struct = cls._STRUCT_RGB565 if is_rgb565 else cls._STRUCT_RGB888
+        pack_into = pixel_struct.pack_into
+        offset = 0
+        for y in range(bitmap.height):
+            for x in range(bitmap.width):
+                color = palette[bitmap[x, y]]
+                if is_rgb565:
+                    pack_into(
+                        pixel_data,
+                        offset,
+                        (((color >> 19) & 0x1F) << 11)
+                        | (((color >> 10) & 0x3F) << 5)
+                        | ((color >> 3) & 0x1F),
+                    )
+                else:
+                    # Pixels are little-endian, so the bytes are blue, green, red.
+                    pack_into(
+                        pixel_data,
+                        offset,
+                        color & 0xFF,
+                        (color >> 8) & 0xFF,
+                        (color >> 16) & 0xFF,
+                    )
+                offset += bytes_per_pixel
+
+        return cls(
+            bytes(pixel_data),
+            color_depth,
+            bitmap.width,
+            bitmap.height,
+            bitmap_and_palette=(bitmap, palette),
+        )
+
+    @classmethod
+    def parse_private(cls, packet):
+        """Construct an ImagePacket from an incoming packet.
+        Do not call this directly; call Packet.from_bytes() instead.
+        pylint makes it difficult to call this method _parse(), hence the name.
+        """
+        color_depth, width, height = cls._PARSE_META_STRUCT.unpack_from(packet)
+        return cls(bytes(packet[cls._METADATA_LENGTH : -1]), color_depth, width, height)
+
+    @classmethod
+    def read_stream_private(cls, header, stream):
+        """Read the rest of an image packet from the stream: the metadata
+        gives the image size, then the pixel data arrives in interleaved
+        chunks, each acknowledged so the sender knows to continue.
+
+        Do not call this directly. It's called from ``Packet.from_stream()``.
+        """
+        metadata = stream.read(cls._META_STRUCT.size)
+        color_depth, width, height = cls._META_STRUCT.unpack(metadata)
+        size_data = width * height * (2 if color_depth == 16 else 3)
+        # Assemble the packet into a preallocated buffer of the exact packet
+        # size, sizing the final read to exactly the remaining payload.
+        metadata_length = cls._METADATA_LENGTH
+        interleave_size = cls._INTERLEAVE_SIZE
+        packet = bytearray(metadata_length + size_data + 1)
+        packet[0:2] = header
+        packet[2:metadata_length] = metadata
+        offset = metadata_length
+        remaining = size_data
+        while remaining:
+            chunk_size = min(interleave_size, remaining)
+            packet[offset : offset + chunk_size] = stream.read(chunk_size)
+            stream.write(b"\x06")
+            offset += chunk_size
+            remaining -= chunk_size
+        packet[-1:] = stream.read(1)
+        return bytes(packet)
+
+    def _pixel_colors(self):
+        """Yield each pixel of the raw data as a 24-bit 0xRRGGBB color."""
+        if self._color_depth == 16:
+            # View the raw data as 16-bit values rather than unpacking each
+            # pixel through struct.
+            pixels = array("H")
+            pixels.frombytes(self._raw_pixels)
+            if sys.byteorder == "big":
+                pixels.byteswap()
+            if _USE_LUT:
+                # Bind the tables to locals so the loop skips the global
+                # lookups on every pixel.
+                channel5 = _CHANNEL5_TO_8
+                channel6 = _CHANNEL6_TO_8
+                for value in pixels:
+                    yield (
+                        (channel5[(value >> 11) & 0x1F] << 16)
+                        | (channel6[(value >> 5) & 0x3F] << 8)
+                        | channel5[value & 0x1F]
+                    )
+            else:
+                for value in pixels:
+                    red = (value >> 11) & 0x1F
+                    green = (value >> 5) & 0x3F
+                    blue = value & 0x1F
+                    yield (
+                        (((red << 3) | (red >> 2)) << 16)
+                        | (((green << 2) | (green >> 4)) << 8)
+                        | ((blue << 3) | (blue >> 2))
+                    )
+        else:
+            # Pixels are little-endian, so the bytes are blue, green, red.
+            pixels = memoryview(self._raw_pixels)
+            for offset in range(0, len(pixels), 3):
+                yield (
+                    (pixels[offset + 2] << 16)
+                    | (pixels[offset + 1] << 8)
+                    | pixels[offset]
+                )
+
+    def _parse_pixels_numpy(self):
+        # Vectorized variant of _parse_pixels, used when numpy is available.
+        if self._color_depth == 16:
+            values = _np.frombuffer(self._raw_pixels, dtype="<u2").astype(_np.uint32)
+            red = (values >> 11) & 0x1F
+            green = (values >> 5) & 0x3F
+            blue = values & 0x1F
+            colors = (
+                (((red << 3) | (red >> 2)) << 16)
+                | (((green << 2) | (green >> 4)) << 8)
+                | ((blue << 3) | (blue >> 2))
+            )
+        else:
+            values = _np.frombuffer(self._raw_pixels, dtype=_np.uint8).astype(
+                _np.uint32
+            )
+            colors = (values[2::3] << 16) | (values[1::3] << 8) | values[0::3]
+
+        # One pass builds both the palette colors and the per-pixel indices.
+        # Note unique() returns the colors sorted, so the palette order
+        # differs from the pure-Python path's first-appearance order; the
+        # bitmap indices stay consistent either way.
+        unique_colors, indices = _np.unique(colors, return_inverse=True)
+
+        # displayio has no bulk setters, but binding __setitem__ to a local
+        # at least drops the attribute dispatch from each assignment.
+        palette = displayio.Palette(len(unique_colors))
+        palette_set = palette.__setitem__
+        for palette_index, palette_color in enumerate(unique_colors.tolist()):
+            palette_set(palette_index, palette_color)
+
+        bitmap = displayio.Bitmap(self._width, self._height, len(unique_colors))
+        bitmap_set = bitmap.__setitem__
+        for index, palette_index in enumerate(indices.tolist()):
+            bitmap_set(index, palette_index)
+
+        self._bitmap = bitmap
+        self._palette = palette
+
+    def _parse_pixels(self):
+        """Parse the raw pixel data into a displayio ``Bitmap`` and ``Palette``."""
+        if _np is not None:
+            self._parse_pixels_numpy()
+            return
+
+        # Walk the pixels once, discovering palette colors and filling in the
+        # bitmap as we go. The bitmap has to be allocated before the number
+        # of unique colors is known, so size it for the worst case, capped at
+        # 256 entries: displayio sizes the pixel storage by value count, so a
+        # 65535-value cap would cost 16 bits per pixel even for a two-color
+        # image, while 256 keeps it to 8. A dict keeps the lookup for each
+        # pixel O(1) instead of a linear scan of the palette collected so far.
+        max_colors = min(self._width * self._height, 256)
+        bitmap = displayio.Bitmap(self._width, self._height, max_colors)
+        color_to_index = {}
+        get_index = color_to_index.get
+        for index, palette_color in enumerate(self._pixel_colors()):
+            palette_index = get_index(palette_color)
+            if palette_index is None:
+                palette_index = len(color_to_index)
+                if palette_index >= max_colors:
+                    raise ValueError("Too many unique colors in image")
+                color_to_index[palette_color] = palette_index
+            bitmap[index] = palette_index
+
+        # The palette is created at its exact final size; binding __setitem__
+        # to a local drops the attribute dispatch from each assignment.
+        palette = displayio.Palette(len(color_to_index))
+        palette_set = palette.__setitem__
+        for palette_color, palette_index in color_to_index.items():
+            palette_set(palette_index, palette_color)
+
+        self._bitmap = bitmap
+        self._palette = palette
+
+    def to_bytes(self):
+        """Return the bytes needed to send this packet."""
+        # Pack everything into one preallocated buffer; going through
+        # add_checksum would copy the whole pixel payload twice more.
+        raw_pixels = self._raw_pixels
+        metadata_length = self._METADATA_LENGTH
+        packet = bytearray(metadata_length + len(raw_pixels) + 1)
+        self._CONSTRUCT_STRUCT.pack_into(
+            packet, 0, self._TYPE_HEADER, self._color_depth, self._width, self._height
+        )
+        packet[metadata_length:-1] = raw_pixels
+        checksum = self._cached_checksum
+        if checksum is None:
+            checksum = self.checksum(memoryview(packet)[:-1])
+            if isinstance(raw_pixels, bytes):
+                # The payload is immutable, so the checksum can't go stale;
+                # retransmits skip re-summing the whole packet.
+                self._cached_checksum = checksum
+        packet[-1] = checksum
+        return bytes(packet)
+
+    @property
+    def bitmap(self):
+        """A ``displayio.Bitmap`` of the image, indexed into ``palette``."""
+        return self._bitmap
+
+    @property
+    def palette(self):
+        """A ``displayio.Palette`` holding the unique colors of the image."""
+        return self._palette
+
+    @property
+    def colorspace(self):
+        """The ``displayio.Colorspace`` of the raw pixel data."""
+        if self._color_depth == 16:
+            return displayio.Colorspace.RGB565
+        return displayio.Colorspace.RGB888
+
+    @property
+    def width(self):
+        """The width of the image in pixels."""
+        return self._width
+
+    @property
+    def height(self):
+        """The height of the image in pixels."""
+        return self._height
+
+
+# Register this class with the superclass. This allows the user to import only what is needed.
+ImagePacket.register_packet_type()
@@ -12,8 +12,6 @@ Bluefruit Connect App geographical location packet.
 
 """
 
-import struct
-
 from .packet import Packet
 
 
@@ -21,7 +19,6 @@ class LocationPacket(Packet):
     """A packet of latitude, longitude, and altitude values."""
 
     _FMT_PARSE = "<xxfffx"
-    PACKET_LENGTH = struct.calcsize(_FMT_PARSE)
     # _FMT_CONSTRUCT doesn't include the trailing checksum byte.
     _FMT_CONSTRUCT = "<2sfff"
     _TYPE_HEADER = b"!L"
@@ -34,8 +31,7 @@ class LocationPacket(Packet):
 
     def to_bytes(self):
         """Return the bytes needed to send this packet."""
-        partial_packet = struct.pack(
-            self._FMT_CONSTRUCT,
+        partial_packet = self._CONSTRUCT_STRUCT.pack(
             self._TYPE_HEADER,
             self._latitude,
             self._longitude,
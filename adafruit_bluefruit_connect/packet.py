@@ -32,10 +32,19 @@ class Packet:
     # as a reminder and to make pylint happy.
     # _FMT_PARSE is the whole packet.
     _FMT_PARSE = None
-    # In each class, set PACKET_LENGTH = struct.calcsize(_FMT_PARSE).
-    PACKET_LENGTH = None
     # _FMT_CONSTRUCT does not include the trailing byte, which is the checksum.
     _FMT_CONSTRUCT = None
+    # PACKET_LENGTH and the compiled structs below are derived from the format
+    # strings by register_packet_type().
+    PACKET_LENGTH = None
+    _PARSE_STRUCT = None
+    _CONSTRUCT_STRUCT = None
+
+    # Variable-length packets (images) are streamed in acknowledged chunks;
+    # they reimplement read_stream_private() and define the _METADATA_LENGTH
+    # and _INTERLEAVE_SIZE used by into_stream(). Fixed-length packets are
+    # read whole using PACKET_LENGTH.
+    _VARIABLE_LENGTH = False
     # The first byte of the prefix is always b'!'. The second byte is the type code.
     _TYPE_HEADER = None
 
@@ -46,7 +55,15 @@ class Packet:
         """Register a new packet type, using this class and its ``cls._TYPE_HEADER``.
         The ``from_bytes()`` and ``from_stream()`` methods will then be able
         to recognize this type of packet.
+
+        The class's struct formats are compiled once here, so packing and
+        unpacking packets doesn't re-parse the format strings on every call.
         """
+        if cls._FMT_PARSE:
+            cls._PARSE_STRUCT = struct.Struct(cls._FMT_PARSE)
+            cls.PACKET_LENGTH = cls._PARSE_STRUCT.size
+        if cls._FMT_CONSTRUCT:
+            cls._CONSTRUCT_STRUCT = struct.Struct(cls._FMT_CONSTRUCT)
 
         Packet._type_to_class[cls._TYPE_HEADER] = cls
 
@@ -66,10 +83,15 @@ class Packet:
         if not issubclass(packet_class, cls):
             raise ValueError("Packet type is not a {}".format(cls.__name__))
 
-        if len(packet) != packet_class.PACKET_LENGTH:
+        # Image packets are variable length (their PACKET_LENGTH is None),
+        # so only fixed-length packets can be length-checked here.
+        packet_length = packet_class.PACKET_LENGTH
+        if packet_length is not None and len(packet) != packet_length:
             raise ValueError("Wrong length packet")
 
-        if cls.checksum(packet[0:-1]) != packet[-1]:
+        # A memoryview aliases the packet rather than copying everything but
+        # the last byte, which matters for large image payloads.
+        if cls.checksum(memoryview(packet)[:-1]) != packet[-1]:
             raise ValueError("Bad checksum")
 
         # A packet class may do further validation of the data.
@@ -117,8 +139,47 @@ class Packet:
         packet_class = cls._type_to_class.get(header, None)
         if not packet_class:
             raise ValueError("Unregistered packet type {}".format(header))
-        packet = header + stream.read(packet_class.PACKET_LENGTH - 2)
-        return cls.from_bytes(packet)
+
+        return cls.from_bytes(packet_class.read_stream_private(header, stream))
+
+    @classmethod
+    def read_stream_private(cls, header, stream):
+        """Read the rest of this type of packet from the stream, after the
+        two header bytes have been read, and return the complete packet.
+        Variable-length packet types reimplement this.
+
+        Do not call this directly. It's called from ``Packet.from_stream()``.
+        pylint makes it difficult to call this method _read_stream(), hence the name.
+        """
+        return header + stream.read(cls.PACKET_LENGTH - 2)
+
+    def into_stream(self, stream):
+        """Write this packet to the outgoing stream.
+
+        :param stream stream: an output stream that provides standard stream
+          write operations, such as ``ble.UARTServer`` or ``busio.UART``.
+        """
+        packet = self.to_bytes()
+        if self._VARIABLE_LENGTH:
+            # Write the metadata, then the pixel data in interleaved chunks,
+            # waiting for an acknowledgement of each chunk before continuing.
+            metadata_length = self._METADATA_LENGTH
+            interleave_size = self._INTERLEAVE_SIZE
+            stream.write(packet[0:metadata_length])
+            pixel_data = memoryview(packet)[metadata_length:-1]
+            offset = 0
+            remaining = len(pixel_data)
+            while remaining:
+                chunk_size = (
+                    interleave_size if remaining >= interleave_size else remaining
+                )
+                stream.write(pixel_data[offset : offset + chunk_size])
+                stream.read(1)
+                offset += chunk_size
+                remaining -= chunk_size
+            stream.write(packet[-1:])
+        else:
+            stream.write(packet)
 
     @classmethod
     def parse_private(cls, packet):
@@ -130,12 +191,24 @@ class Packet:
         Do not call this directly. It's called from ``cls.from_bytes()``.
         pylint makes it difficult to call this method _parse(), hence the name.
         """
-        return cls(*struct.unpack(cls._FMT_PARSE, packet))
+        return cls(*cls._PARSE_STRUCT.unpack(packet))
+
+    def to_bytes(self):
+        """Return the bytes needed to send this packet. Each concrete
+        subclass implements this for its own layout. ``into_stream()``
+        and user code call it; this abstract version only documents the
+        contract.
+        """
+        raise NotImplementedError("to_bytes() left to be implemented by subclasses")
 
     @staticmethod
     def checksum(partial_packet):
-        """Compute checksum for bytes, not including the checksum byte itself."""
-        return ~sum(partial_packet) & 0xFF
+        """Compute checksum for bytes, not including the checksum byte itself.
+        ``partial_packet`` may be any object supporting the buffer protocol.
+        """
+        # Summing a memoryview avoids re-boxing each byte of a large image
+        # payload through the bytes iterator.
+        return ~sum(memoryview(partial_packet)) & 0xFF
 
     def add_checksum(self, partial_packet):
         """Compute the checksum of partial_packet and return a new bytes
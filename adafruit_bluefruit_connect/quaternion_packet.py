@@ -12,8 +12,6 @@ Bluefruit Connect App Quaternion data packet.
 
 """
 
-import struct
-
 from ._xyz_packet import _XYZPacket
 
 
@@ -24,7 +22,6 @@ class QuaternionPacket(_XYZPacket):
     # Use _XYZPacket to handle x, y, z, and add w.
 
     _FMT_PARSE = "<xxffffx"
-    PACKET_LENGTH = struct.calcsize(_FMT_PARSE)
     # _FMT_CONSTRUCT doesn't include the trailing checksum byte.
     _FMT_CONSTRUCT = "<2sffff"
     _TYPE_HEADER = b"!Q"
@@ -36,10 +33,10 @@ class QuaternionPacket(_XYZPacket):
 
     def to_bytes(self):
         """Return the bytes needed to send this packet."""
-        partial_packet = struct.pack(
-            self._FMT_CONSTRUCT, self._TYPE_HEADER, self._x, self._y, self._z, self._w
+        partial_packet = self._CONSTRUCT_STRUCT.pack(
+            self._TYPE_HEADER, self._x, self._y, self._z, self._w
         )
-        return partial_packet + self.checksum(partial_packet)
+        return self.add_checksum(partial_packet)
 
     @property
     def w(self):
@@ -37,6 +37,12 @@ class RawTextPacket(Packet):
         else:
             raise ValueError("Text must be a bytes string")
 
+    def to_bytes(self):
+        """Return the bytes needed to send this packet. Raw text packets
+        have no packet header or checksum, so this is simply the text.
+        """
+        return self._text
+
     @property
     def text(self):
         """Return the text associated with the object."""